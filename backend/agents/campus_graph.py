@@ -230,24 +230,22 @@ class CampusAgentGraph:
     
     def _generate_campus_insights(self, building_states: Dict[str, Any]) -> Dict[str, Any]:
         """Generate campus-wide insights and recommendations."""
-        # Aggregate campus metrics
-        total_energy = sum(b['total_energy_kw'] for b in building_states.values())
-        total_water = sum(b['total_water_lph'] for b in building_states.values())
-        total_occupancy = sum(b['total_occupancy'] for b in building_states.values())
-        total_capacity = sum(b['total_capacity'] for b in building_states.values())
+        # Aggregate campus metrics and savings potential in one pass
+        total_energy = total_water = 0
+        total_occupancy = total_capacity = total_rooms = 0
+        total_kwh_savings = total_water_savings = 0
+        for b in building_states.values():
+            total_energy += b['total_energy_kw']
+            total_water += b['total_water_lph']
+            total_occupancy += b['total_occupancy']
+            total_capacity += b['total_capacity']
+            total_rooms += b['total_rooms']
+            savings = b['savings_analysis']
+            total_kwh_savings += savings['estimated_kwh_saved']
+            total_water_savings += savings['estimated_water_saved_lph']
         
         occupancy_rate = (total_occupancy / max(total_capacity, 1)) * 100
         
-        # Aggregate savings potential
-        total_kwh_savings = sum(
-            b['savings_analysis']['estimated_kwh_saved'] 
-            for b in building_states.values()
-        )
-        total_water_savings = sum(
-            b['savings_analysis']['estimated_water_saved_lph'] 
-            for b in building_states.values()
-        )
-        
         # Identify critical buildings
         critical_buildings = sorted(
             building_states.items(),
@@ -265,7 +263,7 @@ class CampusAgentGraph:
             "timestamp": datetime.now().isoformat(),
             "summary": {
                 "total_buildings": len(building_states),
-                "total_rooms": sum(b['total_rooms'] for b in building_states.values()),
+                "total_rooms": total_rooms,
                 "total_energy_kw": round(total_energy, 2),
                 "total_water_lph": round(total_water, 2),
                 "total_occupancy": total_occupancy,
@@ -3,10 +3,16 @@ Real-time Person Detection Module using YOLOv8
 Detects and counts the number of people in captured frames.
 """
 
+import asyncio
+import base64
 import numpy as np
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
 from pathlib import Path
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,17 @@ except ImportError:
     YOLO_AVAILABLE = False
     logger.warning("YOLOv8 not available - install with: pip install ultralytics")
 
+# Probe CUDA once at import; the check initializes the driver and isn't free
+try:
+    import torch
+    CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+# Single dedicated inference thread: keeps YOLO off the event loop and
+# serializes CUDA stream use instead of contending for cuDNN across threads
+_INFER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yolo")
+
 
 class PersonDetector:
     """Detects and counts people in images/video frames using YOLOv8."""
@@ -37,11 +54,27 @@ class PersonDetector:
     TEXT_BG_COLOR = (0, 0, 0)       # Black text background
     TEXT_COLOR = (255, 255, 255)    # White text
     
+    # Label font (cv2.FONT_HERSHEY_SIMPLEX)
+    FONT = cv2.FONT_HERSHEY_SIMPLEX if CV2_AVAILABLE else 0
+    LABEL_FONT_SCALE = 0.5
+    
+    # Output encoding
+    JPEG_QUALITY = 75
+    
+    # Inference engine settings
+    IMG_SIZE = 640                  # Square input size the engine is built for
+    MAX_BATCH = 8                   # Largest batch the exported engine accepts
+    BATCH_WINDOW_S = 0.005          # How long to wait for more frames to batch
+    ENGINE_DIR = Path(__file__).parent.parent / "engines"
+    
     def __init__(
         self,
         model_name: str = "yolov8n.pt",
         conf_threshold: float = 0.4,
-        device: str = "cpu"
+        device: str = "cpu",
+        precision: str = "fp32",
+        calibration_data: str = "",
+        detect_every: int = 1
     ):
         """
         Initialize the PersonDetector.
@@ -50,11 +83,33 @@ class PersonDetector:
             model_name: YOLOv8 model variant (yolov8n/s/m/l/x, default: nano for speed)
             conf_threshold: Confidence threshold for detections (0.0-1.0)
             device: Device to run inference on ('cpu' or 'cuda' for GPU)
+            precision: 'fp32' (PyTorch weights), 'fp16' or 'int8' (exported engine)
+            calibration_data: Dataset YAML used to calibrate INT8 exports
+            detect_every: Run YOLO on every Nth frame of a stream and reuse the
+                last detections in between (1 = detect on every frame)
         """
         self.model_name = model_name
         self.conf_threshold = conf_threshold
         self.device = device
+        self.precision = precision
+        self.calibration_data = calibration_data
+        self.detect_every = max(1, detect_every)
         self.model = None
+        
+        # Widest label ("Person 0.99") measured once for the label backgrounds
+        self._label_w, self._label_h = (
+            cv2.getTextSize("Person 0.99", self.FONT, self.LABEL_FONT_SCALE, 1)[0]
+            if CV2_AVAILABLE else (0, 0)
+        )
+        
+        # Per-stream (frame_idx, last_detection) used to skip inference
+        self._stream_cache: Dict[str, Tuple[int, Any]] = {}
+        
+        # Micro-batching queue, bound lazily to the running event loop
+        self._batch_queue: asyncio.Queue = None
+        self._batch_loop: asyncio.AbstractEventLoop = None
+        self._batch_worker: asyncio.Task = None
+        
         self._initialize_model()
     
     def _initialize_model(self) -> None:
@@ -71,16 +126,71 @@ class PersonDetector:
         try:
             logger.info(f"Loading YOLOv8 model: {self.model_name}")
             self.model = YOLO(self.model_name)
-            self.model.to(self.device)
-            logger.info(f"✓ Model loaded successfully on {self.device.upper()}")
+            if self.precision != "fp32":
+                self.model = self._load_exported_model()
+            else:
+                self.model.to(self.device)
+            logger.info(f"✓ Model loaded successfully on {self.device.upper()} ({self.precision.upper()})")
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
     
+    def _load_exported_model(self) -> "YOLO":
+        """
+        Export the loaded weights to an optimized inference engine and load it.
+        
+        CUDA devices get a TensorRT engine (FP16 or INT8), CPUs get an OpenVINO
+        INT8 model. Exports are cached on disk keyed by model, device, precision
+        and input size, so startup only recompiles when one of those changes.
+        Falls back to the PyTorch weights if the export fails.
+        
+        Returns:
+            YOLO model backed by the exported engine
+        """
+        on_gpu = self.device.startswith("cuda")
+        if not on_gpu and self.precision != "int8":
+            # FP16 buys nothing on CPU; keep the PyTorch weights
+            self.precision = "fp32"
+            self.model.to(self.device)
+            return self.model
+        
+        export_format = "engine" if on_gpu else "openvino"
+        stem = Path(self.model_name).stem
+        device_tag = self.device.replace(":", "")
+        suffix = ".engine" if on_gpu else "_openvino_model"
+        cache_path = self.ENGINE_DIR / f"{stem}_{device_tag}_{self.precision}_{self.IMG_SIZE}{suffix}"
+        
+        try:
+            if not cache_path.exists():
+                logger.info(f"Exporting {self.model_name} to {export_format} ({self.precision.upper()})...")
+                export_args = {
+                    "format": export_format,
+                    "imgsz": self.IMG_SIZE,
+                    "half": self.precision == "fp16",
+                    "int8": self.precision == "int8",
+                    "dynamic": True,  # variable batch size; _infer letterboxes inputs to IMG_SIZE
+                    "batch": self.MAX_BATCH,
+                }
+                if on_gpu:
+                    export_args["device"] = self.device
+                if self.precision == "int8" and self.calibration_data:
+                    export_args["data"] = self.calibration_data
+                exported_path = self.model.export(**export_args)
+                self.ENGINE_DIR.mkdir(parents=True, exist_ok=True)
+                Path(exported_path).replace(cache_path)
+            return YOLO(str(cache_path), task="detect")
+        except Exception as e:
+            logger.warning(f"Engine export failed, using PyTorch weights: {e}")
+            self.precision = "fp32"
+            self.model.to(self.device)
+            return self.model
+    
     def detect_people(
         self,
         frame: np.ndarray,
-        draw_boxes: bool = True
+        draw_boxes: bool = True,
+        copy_frame: bool = False,
+        stream_id: str = None
     ) -> Tuple[int, np.ndarray, Dict[str, Any]]:
         """
         Detect people in a frame using YOLOv8.
@@ -88,18 +198,203 @@ class PersonDetector:
         Args:
             frame: Input image/frame (numpy array, BGR format)
             draw_boxes: Whether to draw bounding boxes on the output
+            copy_frame: Draw on a copy instead of the input frame (boxes are
+                drawn in-place by default)
+            stream_id: Camera/room the frame belongs to; enables frame skipping
         
         Returns:
             Tuple of (person_count, processed_frame, detection_details)
         """
+        self._check_ready()
+        
+        # Run inference (unless this stream can reuse its last detection)
+        detection = self._reuse_detection(stream_id)
+        if detection is None:
+            detection = self._infer([frame])[0]
+            self._remember_detection(stream_id, detection)
+        
+        return self._process_result(frame, detection, draw_boxes, copy_frame)
+    
+    async def detect_people_async(
+        self,
+        frame: np.ndarray,
+        draw_boxes: bool = True,
+        copy_frame: bool = False,
+        stream_id: str = None
+    ) -> Tuple[int, np.ndarray, Dict[str, Any]]:
+        """
+        Detect people in a frame through the shared micro-batching queue.
+        
+        Frames submitted concurrently (e.g. several rooms streaming at once)
+        are coalesced into a single YOLO forward pass, amortizing kernel launch
+        and transfer overhead across the batch.
+        
+        Args:
+            frame: Input image/frame (numpy array, BGR format)
+            draw_boxes: Whether to draw bounding boxes on the output
+            copy_frame: Draw on a copy instead of the input frame (boxes are
+                drawn in-place by default)
+            stream_id: Camera/room the frame belongs to; enables frame skipping
+        
+        Returns:
+            Tuple of (person_count, processed_frame, detection_details)
+        """
+        self._check_ready()
+        
+        # Drawing runs in a worker thread too, so the event loop only coordinates
+        detection = self._reuse_detection(stream_id)
+        if detection is not None:
+            return await asyncio.to_thread(self._process_result, frame, detection, draw_boxes, copy_frame)
+        
+        loop = asyncio.get_running_loop()
+        if self._batch_queue is None or self._batch_loop is not loop:
+            self._batch_queue = asyncio.Queue()
+            self._batch_loop = loop
+            self._batch_worker = loop.create_task(self._run_batch_worker(self._batch_queue))
+        
+        future = loop.create_future()
+        await self._batch_queue.put((frame, future))
+        detection = await future
+        self._remember_detection(stream_id, detection)
+        
+        return await asyncio.to_thread(self._process_result, frame, detection, draw_boxes, copy_frame)
+    
+    async def _run_batch_worker(self, queue: asyncio.Queue) -> None:
+        """Drain queued frames into batches and run one forward pass per batch."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.BATCH_WINDOW_S
+            
+            # Collect more frames until the batch is full or the window closes
+            while len(batch) < self.MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            frames = [frame for frame, _ in batch]
+            try:
+                detections = await loop.run_in_executor(_INFER_POOL, self._infer, frames)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), detection in zip(batch, detections):
+                if not future.done():
+                    future.set_result(detection)
+    
+    def _reuse_detection(self, stream_id: str) -> Any:
+        """
+        Advance a stream's frame counter and return its cached detection if
+        this frame should skip inference, otherwise None.
+        """
+        if stream_id is None or self.detect_every <= 1:
+            return None
+        
+        frame_idx, detection = self._stream_cache.get(stream_id, (0, None))
+        self._stream_cache[stream_id] = (frame_idx + 1, detection)
+        
+        if frame_idx % self.detect_every == 0:
+            return None
+        return detection
+    
+    def _remember_detection(self, stream_id: str, detection: Any) -> None:
+        """Cache a fresh detection for reuse on the stream's skipped frames."""
+        if stream_id is None or self.detect_every <= 1:
+            return
+        
+        frame_idx, _ = self._stream_cache.get(stream_id, (1, None))
+        self._stream_cache[stream_id] = (frame_idx, detection)
+    
+    def _check_ready(self) -> None:
+        """Ensure the model and OpenCV are available before detecting."""
         if self.model is None:
             raise RuntimeError("Model not initialized. Call _initialize_model() first.")
         if not CV2_AVAILABLE:
             raise RuntimeError("OpenCV not available for drawing boxes")
+    
+    def _infer(self, frames: List[np.ndarray]) -> List[Tuple[Any, float, Tuple[int, int]]]:
+        """
+        Run a single YOLO forward pass over a list of frames.
         
-        # Run inference
-        results = self.model(frame, conf=self.conf_threshold, verbose=False)
+        Exported engines are built with dynamic axes so the micro-batch size
+        can vary, but their optimization profile is tuned for IMG_SIZE inputs
+        and Ultralytics only does rectangular letterboxing for PyTorch weights.
+        Their frames are therefore letterboxed to the square IMG_SIZE here,
+        which makes Ultralytics' own resize a no-op. PyTorch weights get the
+        raw frames: the rectangular letterbox (e.g. 640x384 for 16:9) needs
+        less compute than a padded square.
         
+        Returns:
+            One (result, scale, (pad_x, pad_y)) tuple per frame
+        """
+        if self.precision == "fp32":
+            results = self.model(frames, conf=self.conf_threshold, imgsz=self.IMG_SIZE, verbose=False)
+            # Boxes already come back in original frame coordinates
+            return [(result, 1.0, (0, 0)) for result in results]
+        
+        letterboxed = [self._letterbox(frame) for frame in frames]
+        results = self.model(
+            [image for image, _, _ in letterboxed],
+            conf=self.conf_threshold,
+            imgsz=self.IMG_SIZE,
+            verbose=False
+        )
+        return [
+            (result, scale, pad)
+            for result, (_, scale, pad) in zip(results, letterboxed)
+        ]
+    
+    def _letterbox(self, frame: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        """
+        Resize a frame to IMG_SIZE x IMG_SIZE, preserving aspect ratio with padding.
+        
+        Returns:
+            Tuple of (letterboxed_frame, scale, (pad_x, pad_y))
+        """
+        height, width = frame.shape[:2]
+        if height == self.IMG_SIZE and width == self.IMG_SIZE:
+            return frame, 1.0, (0, 0)
+        
+        scale = min(self.IMG_SIZE / height, self.IMG_SIZE / width)
+        new_width, new_height = round(width * scale), round(height * scale)
+        resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+        
+        pad_x = (self.IMG_SIZE - new_width) // 2
+        pad_y = (self.IMG_SIZE - new_height) // 2
+        letterboxed = np.full((self.IMG_SIZE, self.IMG_SIZE, 3), 114, dtype=np.uint8)
+        letterboxed[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = resized
+        
+        return letterboxed, scale, (pad_x, pad_y)
+    
+    def _process_result(
+        self,
+        frame: np.ndarray,
+        detection: Tuple[Any, float, Tuple[int, int]],
+        draw_boxes: bool,
+        copy_frame: bool = False
+    ) -> Tuple[int, np.ndarray, Dict[str, Any]]:
+        """
+        Count people in a YOLO result and optionally draw them on the frame.
+        
+        Args:
+            frame: Frame the result was computed for
+            detection: (result, scale, (pad_x, pad_y)) tuple from _infer
+            draw_boxes: Whether to draw bounding boxes on the output
+            copy_frame: Draw on a copy instead of the input frame (boxes are
+                drawn in-place by default)
+        
+        Returns:
+            Tuple of (person_count, processed_frame, detection_details)
+        """
         person_count = 0
         detection_details = {
             "frame_shape": frame.shape,
@@ -109,62 +404,63 @@ class PersonDetector:
         }
         
         # Process detections
-        output_frame = frame.copy() if draw_boxes else frame
+        output_frame = frame.copy() if (draw_boxes and copy_frame) else frame
         
-        if results and len(results) > 0:
-            boxes = results[0].boxes
+        result, scale, (pad_x, pad_y) = detection
+        if result is not None:
+            boxes = result.boxes
             detection_details["total_detections"] = len(boxes)
             
-            for box in boxes:
-                # Get class ID and confidence
-                cls_id = int(box.cls)
-                confidence = float(box.conf)
-                
-                # Only count people (class 0 in COCO)
-                if cls_id == self.PERSON_CLASS_ID:
-                    person_count += 1
-                    detection_details["person_detections"].append({
-                        "confidence": confidence,
-                        "box": box.xyxy[0].tolist()  # [x1, y1, x2, y2]
-                    })
-                    detection_details["confidence_scores"].append(confidence)
+            # Pull all tensors to the host once instead of syncing per box
+            cls_ids = boxes.cls.cpu().numpy().astype(np.int32)
+            confidences = boxes.conf.cpu().numpy()
+            xyxy = boxes.xyxy.cpu().numpy()
+            
+            # Map boxes from letterboxed coordinates back onto the original frame
+            # (identity for frames Ultralytics letterboxed itself)
+            xyxy = (xyxy - (pad_x, pad_y, pad_x, pad_y)) / scale
+            xyxy[:, 0::2] = xyxy[:, 0::2].clip(0, frame.shape[1])
+            xyxy[:, 1::2] = xyxy[:, 1::2].clip(0, frame.shape[0])
+            
+            # Only count people (class 0 in COCO)
+            person_mask = cls_ids == self.PERSON_CLASS_ID
+            person_count = int(person_mask.sum())
+            person_conf = confidences[person_mask]
+            person_xyxy = xyxy[person_mask]
+            
+            detection_details["confidence_scores"] = person_conf.tolist()
+            detection_details["person_detections"] = [
+                {"confidence": confidence, "box": box}  # box: [x1, y1, x2, y2]
+                for confidence, box in zip(person_conf.tolist(), person_xyxy.tolist())
+            ]
+            
+            # Draw bounding boxes if requested
+            if draw_boxes:
+                for (x1, y1, x2, y2), confidence in zip(person_xyxy.astype(np.int32).tolist(), person_conf.tolist()):
+                    cv2.rectangle(
+                        output_frame,
+                        (x1, y1),
+                        (x2, y2),
+                        self.BOX_COLOR,
+                        2
+                    )
                     
-                    # Draw bounding box if requested
-                    if draw_boxes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        cv2.rectangle(
-                            output_frame,
-                            (x1, y1),
-                            (x2, y2),
-                            self.BOX_COLOR,
-                            2
-                        )
-                        
-                        # Draw label with confidence
-                        label = f"Person {confidence:.2f}"
-                        label_size = cv2.getTextSize(
-                            label,
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5,
-                            1
-                        )[0]
-                        
-                        cv2.rectangle(
-                            output_frame,
-                            (x1, y1 - label_size[1] - 4),
-                            (x1 + label_size[0], y1),
-                            self.TEXT_BG_COLOR,
-                            -1
-                        )
-                        cv2.putText(
-                            output_frame,
-                            label,
-                            (x1, y1 - 2),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5,
-                            self.TEXT_COLOR,
-                            1
-                        )
+                    # Draw label with confidence
+                    label = f"Person {confidence:.2f}"
+                    
+                    # Solid label background as a direct slice fill
+                    label_top = max(0, y1 - self._label_h - 4)
+                    label_right = min(output_frame.shape[1], x1 + self._label_w + 1)
+                    output_frame[label_top:y1 + 1, x1:label_right] = self.TEXT_BG_COLOR
+                    cv2.putText(
+                        output_frame,
+                        label,
+                        (x1, y1 - 2),
+                        self.FONT,
+                        self.LABEL_FONT_SCALE,
+                        self.TEXT_COLOR,
+                        1
+                    )
         
         # Draw count banner if boxes were drawn
         if draw_boxes:
@@ -191,19 +487,14 @@ class PersonDetector:
             return frame
         
         banner_height = 50
-        banner = np.zeros(
-            (banner_height, frame.shape[1], 3),
-            dtype=np.uint8
-        )
         
-        # Semi-transparent overlay
-        overlay = frame.copy()
-        overlay[:banner_height, :] = banner
-        frame = cv2.addWeighted(overlay, 0.3, frame, 0.7, 0)
+        # Semi-transparent overlay, blended in-place over the banner rows only
+        top = frame[:banner_height, :]
+        cv2.addWeighted(np.zeros_like(top), 0.3, top, 0.7, 0, dst=top)
         
         # Draw count text
         text = f"People Detected: {person_count}"
-        font = cv2.FONT_HERSHEY_SIMPLEX
+        font = self.FONT
         font_scale = 1.5
         thickness = 2
         text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
@@ -226,52 +517,244 @@ class PersonDetector:
     def process_base64_frame(
         self,
         frame_data: str,
-        draw_boxes: bool = True
-    ) -> Tuple[int, str, Dict[str, Any]]:
+        draw_boxes: bool = True,
+        stream_id: str = None,
+        return_frame: bool = True,
+        raw_jpeg: bool = False
+    ) -> Tuple[int, Any, Dict[str, Any]]:
         """
         Process a base64-encoded frame.
         
         Args:
             frame_data: Base64 encoded JPEG frame (without "data:image/jpeg;base64," prefix)
             draw_boxes: Whether to draw bounding boxes
+            stream_id: Camera/room the frame belongs to; enables frame skipping
+            return_frame: Encode the output frame; when False, drawing and
+                encoding are skipped and an empty string is returned instead
+            raw_jpeg: Return the output frame as raw JPEG bytes instead of base64
         
         Returns:
-            Tuple of (person_count, base64_output_frame, detection_details)
+            Tuple of (person_count, output_frame, detection_details)
         """
-        if not CV2_AVAILABLE:
-            raise RuntimeError("OpenCV not available. Install with: pip install opencv-python-headless")
+        try:
+            frame = self._decode_base64_frame(frame_data)
+            return self._process_ndarray(
+                frame, draw_boxes, stream_id, return_frame, raw_jpeg
+            )
+        
+        except Exception as e:
+            logger.error(f"Error processing base64 frame: {e}")
+            raise
+    
+    def process_bytes_frame(
+        self,
+        raw: bytes,
+        draw_boxes: bool = True,
+        stream_id: str = None,
+        return_frame: bool = True,
+        raw_jpeg: bool = False
+    ) -> Tuple[int, Any, Dict[str, Any]]:
+        """
+        Process a raw encoded image (JPEG/PNG/WebP bytes).
         
-        import base64
-        import io
-        from PIL import Image
+        Same as process_base64_frame, minus the base64 decode for callers
+        that already hold the raw bytes (e.g. file uploads).
         
+        Returns:
+            Tuple of (person_count, output_frame, detection_details)
+        """
         try:
-            # Decode base64 to image
-            image_bytes = base64.b64decode(frame_data)
-            img = Image.open(io.BytesIO(image_bytes))
-            frame = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-            
-            # Detect people
-            count, output_frame, details = self.detect_people(frame, draw_boxes)
-            
-            # Encode output frame back to base64
-            _, buffer = cv2.imencode('.jpg', output_frame)
-            output_base64 = base64.b64encode(buffer).decode('utf-8')
-            
-            return count, output_base64, details
+            frame = self._decode_bytes_frame(raw)
+            return self._process_ndarray(
+                frame, draw_boxes, stream_id, return_frame, raw_jpeg
+            )
         
         except Exception as e:
-            logger.error(f"Error processing base64 frame: {e}")
+            logger.error(f"Error processing image bytes: {e}")
+            raise
+    
+    async def process_bytes_frame_async(
+        self,
+        raw: bytes,
+        draw_boxes: bool = True,
+        stream_id: str = None,
+        return_frame: bool = True,
+        raw_jpeg: bool = False
+    ) -> Tuple[int, Any, Dict[str, Any]]:
+        """
+        Process a raw encoded image through the micro-batching queue.
+        
+        Returns:
+            Tuple of (person_count, output_frame, detection_details)
+        """
+        try:
+            frame = await asyncio.to_thread(self._decode_bytes_frame, raw)
+            return await self._process_ndarray_async(
+                frame, draw_boxes, stream_id, return_frame, raw_jpeg
+            )
+        
+        except Exception as e:
+            logger.error(f"Error processing image bytes: {e}")
             raise
+    
+    async def process_batch_async(
+        self,
+        frames_bytes: List[bytes],
+        draw_boxes: List[bool] = None,
+        return_frame: List[bool] = None
+    ) -> List[Any]:
+        """
+        Process several raw encoded images with batched YOLO forward passes.
+        
+        Only the forward passes run on the dedicated inference thread, shared
+        with the micro-batching queue; decoding, drawing and encoding run on
+        the default executor so they never hold that thread.
+        
+        Args:
+            frames_bytes: Raw encoded images (JPEG/PNG/WebP bytes)
+            draw_boxes: Per-frame draw flags (all True by default)
+            return_frame: Per-frame flags for encoding the output frame
+                (all True by default)
+        
+        Returns:
+            One (person_count, base64_output_frame, detection_details) tuple
+            per input, or the exception raised while processing that frame
+        """
+        self._check_ready()
+        
+        if draw_boxes is None:
+            draw_boxes = [True] * len(frames_bytes)
+        if return_frame is None:
+            return_frame = [True] * len(frames_bytes)
+        
+        loop = asyncio.get_running_loop()
+        outputs: List[Any] = [None] * len(frames_bytes)
+        decoded = await asyncio.to_thread(self._decode_batch, frames_bytes, outputs)
+        
+        # One forward pass per MAX_BATCH frames (the engine's batch profile)
+        for start in range(0, len(decoded), self.MAX_BATCH):
+            chunk = decoded[start:start + self.MAX_BATCH]
+            try:
+                detections = await loop.run_in_executor(
+                    _INFER_POOL, self._infer, [frame for _, frame in chunk]
+                )
+            except Exception as e:
+                logger.error(f"Batched inference failed: {e}")
+                for i, _ in chunk:
+                    outputs[i] = e
+                continue
+            await asyncio.to_thread(
+                self._finish_batch_chunk, chunk, detections, draw_boxes, return_frame, outputs
+            )
+        
+        return outputs
+    
+    def _decode_batch(self, frames_bytes: List[bytes], outputs: List[Any]) -> List[Tuple[int, np.ndarray]]:
+        """Decode a batch's frames, recording decode errors in outputs."""
+        decoded = []
+        for i, raw in enumerate(frames_bytes):
+            try:
+                decoded.append((i, self._decode_bytes_frame(raw)))
+            except Exception as e:
+                outputs[i] = e
+        return decoded
+    
+    def _finish_batch_chunk(
+        self,
+        chunk: List[Tuple[int, np.ndarray]],
+        detections: List[Tuple[Any, float, Tuple[int, int]]],
+        draw_boxes: List[bool],
+        return_frame: List[bool],
+        outputs: List[Any]
+    ) -> None:
+        """Count, draw and encode a chunk's results into outputs."""
+        for (i, frame), detection in zip(chunk, detections):
+            try:
+                count, output_frame, details = self._process_result(
+                    frame, detection, draw_boxes[i] and return_frame[i]
+                )
+                encoded = self._encode_frame(output_frame) if return_frame[i] else ""
+                outputs[i] = (count, encoded, details)
+            except Exception as e:
+                outputs[i] = e
+    
+    def _process_ndarray(
+        self,
+        frame: np.ndarray,
+        draw_boxes: bool,
+        stream_id: str,
+        return_frame: bool,
+        raw_jpeg: bool = False
+    ) -> Tuple[int, Any, Dict[str, Any]]:
+        """Detect people in a decoded frame and encode the output."""
+        count, output_frame, details = self.detect_people(
+            frame, draw_boxes and return_frame, copy_frame=False, stream_id=stream_id
+        )
+        
+        if not return_frame:
+            return count, "", details
+        if raw_jpeg:
+            return count, self._encode_jpeg(output_frame), details
+        return count, self._encode_frame(output_frame), details
+    
+    async def _process_ndarray_async(
+        self,
+        frame: np.ndarray,
+        draw_boxes: bool,
+        stream_id: str,
+        return_frame: bool,
+        raw_jpeg: bool = False
+    ) -> Tuple[int, Any, Dict[str, Any]]:
+        """Async variant of _process_ndarray (batched with other concurrent frames)."""
+        count, output_frame, details = await self.detect_people_async(
+            frame, draw_boxes and return_frame, copy_frame=False, stream_id=stream_id
+        )
+        
+        if not return_frame:
+            return count, "", details
+        encode = self._encode_jpeg if raw_jpeg else self._encode_frame
+        return count, await asyncio.to_thread(encode, output_frame), details
+    
+    def _decode_base64_frame(self, frame_data: str) -> np.ndarray:
+        """Decode a base64-encoded image into a BGR frame."""
+        return self._decode_bytes_frame(base64.b64decode(frame_data))
+    
+    def _decode_bytes_frame(self, raw: bytes) -> np.ndarray:
+        """Decode raw encoded image bytes into a BGR frame."""
+        if not CV2_AVAILABLE:
+            raise RuntimeError("OpenCV not available. Install with: pip install opencv-python-headless")
+        
+        # imdecode goes straight to BGR (libjpeg-turbo), no PIL/RGB round-trip
+        buffer = np.frombuffer(raw, dtype=np.uint8)
+        frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("Could not decode image data")
+        return frame
+    
+    def _encode_frame(self, frame: np.ndarray) -> str:
+        """Encode a frame as base64 JPEG."""
+        return base64.b64encode(self._encode_jpeg(frame)).decode('utf-8')
+    
+    def _encode_jpeg(self, frame: np.ndarray) -> bytes:
+        """Encode a frame as raw JPEG bytes."""
+        _, buffer = cv2.imencode(
+            '.jpg',
+            frame,
+            [int(cv2.IMWRITE_JPEG_QUALITY), self.JPEG_QUALITY, int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+        )
+        return buffer.tobytes()
 
 
 # Global detector instance (lazy loaded)
 _detector_instance: PersonDetector = None
+_detector_lock = threading.Lock()
 
 
 def get_detector(
     model_name: str = "yolov8n.pt",
-    conf_threshold: float = 0.4
+    conf_threshold: float = 0.4,
+    precision: str = None,
+    detect_every: int = None
 ) -> PersonDetector:
     """
     Get or create the global PersonDetector instance.
@@ -279,6 +762,8 @@ def get_detector(
     Args:
         model_name: YOLOv8 model variant
         conf_threshold: Confidence threshold for detections
+        precision: Inference precision (defaults to settings.detector_precision)
+        detect_every: Frame-skip interval (defaults to settings.detector_detect_every)
     
     Returns:
         PersonDetector instance
@@ -286,24 +771,26 @@ def get_detector(
     global _detector_instance
     
     if _detector_instance is None:
-        try:
-            device = "cuda" if _check_gpu_available() else "cpu"
-            _detector_instance = PersonDetector(
-                model_name=model_name,
-                conf_threshold=conf_threshold,
-                device=device
-            )
-        except Exception as e:
-            logger.error(f"Failed to initialize detector: {e}")
-            raise
+        # Double-checked so concurrent first requests don't load the model twice
+        with _detector_lock:
+            if _detector_instance is None:
+                try:
+                    device = "cuda" if _check_gpu_available() else "cpu"
+                    _detector_instance = PersonDetector(
+                        model_name=model_name,
+                        conf_threshold=conf_threshold,
+                        device=device,
+                        precision=precision or settings.detector_precision,
+                        calibration_data=settings.detector_calibration_data,
+                        detect_every=detect_every or settings.detector_detect_every
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to initialize detector: {e}")
+                    raise
     
     return _detector_instance
 
 
 def _check_gpu_available() -> bool:
     """Check if CUDA GPU is available."""
-    try:
-        import torch
-        return torch.cuda.is_available()
-    except ImportError:
-        return False
+    return CUDA_AVAILABLE
@@ -0,0 +1,64 @@
+"""Response caching helpers for FastAPI routes."""
+import hashlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Cache namespaces, cleared as a whole when their underlying data changes
+ANALYSIS_NAMESPACE = "analysis"
+CAMPUS_NAMESPACE = "campus"
+
+
+def params_key_builder(
+    func: Callable,
+    namespace: str = "",
+    *,
+    request: Optional[Any] = None,
+    response: Optional[Any] = None,
+    args: tuple = (),
+    kwargs: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    fastapi-cache key builder covering the endpoint and its plain path/query parameters.
+    
+    Keys are stable across data changes, so the in-memory backend holds at
+    most one entry per endpoint and parameter set; callers drop stale entries
+    with FastAPICache.clear(namespace=...) when the data is replaced.
+    """
+    kwargs = kwargs or {}
+    params = sorted(
+        (name, value) for name, value in kwargs.items()
+        if isinstance(value, (str, int, float, bool, type(None)))
+    )
+    raw_key = f"{func.__module__}:{func.__name__}:{params}"
+    return f"{namespace}:{hashlib.md5(raw_key.encode()).hexdigest()}"
+
+
+class RevalidateCachedResponses:
+    """
+    ASGI middleware that makes browsers revalidate server-cached responses.
+    
+    fastapi-cache sends Cache-Control: max-age=<ttl> with every cached
+    response, so browsers would keep serving a response for up to its TTL
+    even after the namespace was cleared server-side. Under the given path
+    prefixes that header is replaced with no-cache; the ETag that
+    fastapi-cache also sends keeps unchanged responses down to a 304.
+    """
+    
+    def __init__(self, app: Callable, path_prefixes: Tuple[str, ...]):
+        self.app = app
+        self.path_prefixes = path_prefixes
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_revalidating(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if any(name.lower() == b"cache-control" for name, _ in headers):
+                    headers = [(name, value) for name, value in headers if name.lower() != b"cache-control"]
+                    headers.append((b"cache-control", b"no-cache"))
+                    message = {**message, "headers": headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_revalidating)
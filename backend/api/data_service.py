@@ -1,10 +1,30 @@
 """Data service for loading and managing campus data."""
-import json
-from typing import Dict, Any
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime, timedelta
 import random
 
+import numpy as np
+import orjson
+
+
+# Occupancy ratio thresholds: < 0.3 low, < 0.7 medium, otherwise high
+_LEVEL_BINS = (0.3, 0.7)
+_LEVEL_NAMES = ("low", "medium", "high")
+_LEVEL_BINS_ARRAY = np.array(_LEVEL_BINS)
+_LEVEL_NAMES_ARRAY = np.array(_LEVEL_NAMES)
+
+
+def _occupancy_level(ratio: float) -> str:
+    """Classify a single occupancy ratio into low/medium/high."""
+    return _LEVEL_NAMES[bisect_right(_LEVEL_BINS, ratio)]
+
+
+def _occupancy_levels(ratios: np.ndarray) -> np.ndarray:
+    """Classify an array of occupancy ratios into low/medium/high."""
+    return _LEVEL_NAMES_ARRAY[np.searchsorted(_LEVEL_BINS_ARRAY, ratios, side="right")]
+
 
 class DataService:
     """Service to load and provide campus data."""
@@ -13,13 +33,17 @@ class DataService:
         self.data_dir = Path(__file__).parent.parent / "data"
         self.campus_data = {}
         self.current_observations = {}
+        self._campus_json_cache: Optional[bytes] = None
+        self._rooms_by_building: Dict[str, List[str]] = {}
     
     async def load_campus_data(self):
         """Load campus structure and generate initial observations."""
         print("📂 Loading campus data...")
         
         # Load or generate campus structure
-        self.campus_data = self._generate_campus_structure()
+        self.campus_data = self._load_campus_structure()
+        self._campus_json_cache = None  # Serialized on first request
+        self._rooms_by_building = self._index_rooms_by_building(self.campus_data)
         
         # Generate current observations
         self.current_observations = self._generate_current_observations()
@@ -27,10 +51,46 @@ class DataService:
         print(f"✓ Loaded {len(self.campus_data.get('buildings', {}))} buildings")
         print(f"✓ Loaded {len(self.campus_data.get('rooms', {}))} rooms")
     
+    def _load_campus_structure(self) -> Dict[str, Any]:
+        """Load the cached campus structure from disk, generating it on first run."""
+        cache_path = self.data_dir / "campus.json"
+        
+        if cache_path.exists():
+            try:
+                return orjson.loads(cache_path.read_bytes())
+            except (OSError, orjson.JSONDecodeError) as e:
+                print(f"⚠️  Ignoring unreadable campus cache: {e}")
+        
+        campus = self._generate_campus_structure()
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(orjson.dumps(campus))
+        except OSError as e:
+            print(f"⚠️  Could not cache campus structure: {e}")
+        
+        return campus
+    
     def get_campus_structure(self) -> Dict[str, Any]:
         """Get campus structure (buildings, rooms, config)."""
         return self.campus_data
     
+    def get_campus_structure_bytes(self) -> bytes:
+        """Get the campus structure pre-serialized as JSON bytes."""
+        if self._campus_json_cache is None:
+            self._campus_json_cache = orjson.dumps(self.campus_data)
+        return self._campus_json_cache
+    
+    def get_building_room_ids(self, building_id: str) -> List[str]:
+        """Get the IDs of a building's rooms from the prebuilt index."""
+        return self._rooms_by_building.get(building_id, [])
+    
+    def _index_rooms_by_building(self, campus: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Build a building_id -> room IDs index for the campus structure."""
+        index: Dict[str, List[str]] = {}
+        for room_id, room in campus.get("rooms", {}).items():
+            index.setdefault(room.get("building_id"), []).append(room_id)
+        return index
+    
     def get_current_observations(self) -> Dict[str, Any]:
         """Get current room observations."""
         return self.current_observations
@@ -39,6 +99,8 @@ class DataService:
         """Update the campus structure from uploaded Excel and regenerate observations."""
         print(f"🔄 Updating campus structure with {len(new_structure.get('buildings', {}))} buildings and {len(new_structure.get('rooms', {}))} rooms")
         self.campus_data = new_structure
+        self._campus_json_cache = None  # Re-serialized on next request
+        self._rooms_by_building = self._index_rooms_by_building(new_structure)
         self.current_observations = self._generate_current_observations()
         print(f"✅ Campus structure updated and observations regenerated")
     
@@ -64,12 +126,7 @@ class DataService:
         occupancy_ratio = occupancy / capacity if capacity > 0 else 0
         
         # Determine occupancy level
-        if occupancy_ratio < 0.3:
-            occupancy_level = "low"
-        elif occupancy_ratio < 0.7:
-            occupancy_level = "medium"
-        else:
-            occupancy_level = "high"
+        occupancy_level = _occupancy_level(occupancy_ratio)
         
         # Update the observation
         if "rooms" not in self.current_observations:
@@ -92,9 +149,14 @@ class DataService:
         return self.current_observations["rooms"][room_id]
     
     def apply_environmental_params(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply user-specified environmental parameters to room data."""
-        modified_data = data.copy()
-        rooms = modified_data.get('rooms', {})
+        """
+        Apply user-specified environmental parameters to room data.
+        
+        Returns a new observations dict; the input (usually the live
+        observations) is left untouched, and only the changed room fields
+        are rewritten.
+        """
+        rooms = data.get('rooms', {})
         
         # Extract parameters with defaults
         avg_occupancy = params.get('avg_occupancy')
@@ -109,80 +171,94 @@ class DataService:
         
         print(f"[DATA_SERVICE] apply_environmental_params called with avg_occupancy={avg_occupancy}")
         
-        for room_id, room_data in rooms.items():
+        # Pre-draw the per-room random values in one batch
+        rng = np.random.default_rng()
+        n = len(rooms)
+        variations = rng.integers(-5, 6, n).tolist()
+        projector_rolls = rng.integers(0, 101, n).tolist()
+        
+        # Determine temperature comfort based on outdoor temp and AC
+        if ac_on:
+            if outdoor_temp > 35:
+                temperature_comfort = 'comfortable'
+            elif outdoor_temp < 15:
+                temperature_comfort = 'too_cold'
+            else:
+                temperature_comfort = 'comfortable'
+        else:
+            if outdoor_temp > 30:
+                temperature_comfort = 'too_hot'
+            elif outdoor_temp < 18:
+                temperature_comfort = 'too_cold'
+            else:
+                temperature_comfort = 'comfortable'
+        
+        # Equipment every room runs regardless of type
+        base_equipment = []
+        if lights_on:
+            base_equipment.append('lights')
+        if ac_on:
+            base_equipment.append(f'ac_{ac_temp}C')
+        if fans_on:
+            base_equipment.append('fans')
+        
+        new_rooms = {}
+        for i, (room_id, room_data) in enumerate(rooms.items()):
             room_type = room_data.get('type', 'classroom')
             raw_capacity = room_data.get('capacity')
             capacity = int(raw_capacity) if raw_capacity is not None else 30
             
+            room_updates = {}
+            
             # Apply occupancy if specified, BUT SKIP if it was recently detected by YOLO
             if avg_occupancy is not None:
                 if room_data.get('detection_method') == 'yolo_camera':
                     print(f"[DATA_SERVICE] Room {room_id}: Keeping real YOLO occupancy ({room_data.get('occupancy')})")
                 else:
-                    variation = random.randint(-5, 5)
+                    variation = variations[i]
                     old_occupancy = int(room_data.get('occupancy') or 0)
-                    room_data['occupancy'] = max(0, min(int(avg_occupancy) + variation, capacity))
-                    print(f"[DATA_SERVICE] Room {room_id}: {old_occupancy} → {room_data['occupancy']} (variation={variation})")
-                    occupancy_ratio = room_data['occupancy'] / capacity if capacity > 0 else 0
-                    if occupancy_ratio < 0.3:
-                        room_data['occupancy_level'] = 'low'
-                    elif occupancy_ratio < 0.7:
-                        room_data['occupancy_level'] = 'medium'
-                    else:
-                        room_data['occupancy_level'] = 'high'
+                    occupancy = max(0, min(int(avg_occupancy) + variation, capacity))
+                    print(f"[DATA_SERVICE] Room {room_id}: {old_occupancy} → {occupancy} (variation={variation})")
+                    occupancy_ratio = occupancy / capacity if capacity > 0 else 0
+                    room_updates['occupancy'] = occupancy
+                    room_updates['occupancy_level'] = _occupancy_level(occupancy_ratio)
             
             # Build equipment list
-            equipment = []
-            if lights_on:
-                equipment.append('lights')
-            if ac_on:
-                equipment.append(f'ac_{ac_temp}C')
-            if fans_on:
-                equipment.append('fans')
+            equipment = list(base_equipment)
             
             # Add projector based on percentage
-            if random.randint(0, 100) < projectors_percent:
+            if projector_rolls[i] < projectors_percent:
                 equipment.append('projector')
             
             # Add computers
             if computers_count > 0 and room_type in ['lab', 'classroom', 'library']:
-                for i in range(min(computers_count, capacity // 2)):
-                    equipment.append(f'computer_{i+1}')
-            
-            room_data['equipment_running'] = equipment
+                equipment.extend(
+                    f'computer_{c + 1}' for c in range(min(computers_count, capacity // 2))
+                )
             
-            # Determine temperature comfort based on outdoor temp and AC
-            if ac_on:
-                if outdoor_temp > 35:
-                    room_data['temperature_comfort'] = 'too_hot' if not ac_on else 'comfortable'
-                elif outdoor_temp < 15:
-                    room_data['temperature_comfort'] = 'too_cold'
-                else:
-                    room_data['temperature_comfort'] = 'comfortable'
-            else:
-                if outdoor_temp > 30:
-                    room_data['temperature_comfort'] = 'too_hot'
-                elif outdoor_temp < 18:
-                    room_data['temperature_comfort'] = 'too_cold'
-                else:
-                    room_data['temperature_comfort'] = 'comfortable'
-            
-            # Add time context
-            room_data['time_of_day'] = time_of_day
-            room_data['outdoor_temperature'] = outdoor_temp
-        
-        modified_data['rooms'] = rooms
-        modified_data['environmental_context'] = {
-            'time_of_day': time_of_day,
-            'outdoor_temperature': outdoor_temp,
-            'hvac_settings': {
-                'ac_on': ac_on,
-                'ac_temp': ac_temp,
-                'fans_on': fans_on
+            new_rooms[room_id] = {
+                **room_data,
+                **room_updates,
+                'equipment_running': equipment,
+                'temperature_comfort': temperature_comfort,
+                # Add time context
+                'time_of_day': time_of_day,
+                'outdoor_temperature': outdoor_temp
             }
-        }
         
-        return modified_data
+        return {
+            **data,
+            'rooms': new_rooms,
+            'environmental_context': {
+                'time_of_day': time_of_day,
+                'outdoor_temperature': outdoor_temp,
+                'hvac_settings': {
+                    'ac_on': ac_on,
+                    'ac_temp': ac_temp,
+                    'fans_on': fans_on
+                }
+            }
+        }
     
     def _generate_campus_structure(self) -> Dict[str, Any]:
         """Generate realistic campus structure."""
@@ -252,78 +328,93 @@ class DataService:
         current_hour = datetime.now().hour
         is_daytime = 8 <= current_hour <= 18
         is_evening = 18 <= current_hour <= 22
+        is_meal_time = current_hour in [7, 8, 12, 13, 18, 19]
         
-        for room_id, room_config in self.campus_data.get("rooms", {}).items():
-            room_type = room_config["type"]
-            capacity = room_config["capacity"]
-            
-            # Generate realistic occupancy based on time and room type
-            if room_type == "classroom":
-                occupancy = random.randint(20, 50) if is_daytime else random.randint(0, 5)
-            elif room_type == "lab":
-                occupancy = random.randint(10, 30) if is_daytime else random.randint(5, 15)
-            elif room_type == "library":
-                occupancy = random.randint(30, 80) if is_evening else random.randint(10, 40)
-            elif room_type == "dorm":
-                occupancy = 2 if not is_daytime else random.randint(0, 1)
-            elif room_type == "cafeteria":
-                is_meal_time = current_hour in [7, 8, 12, 13, 18, 19]
-                occupancy = random.randint(50, 150) if is_meal_time else random.randint(5, 20)
-            else:
-                occupancy = random.randint(0, capacity)
-            
-            occupancy = min(occupancy, capacity)
-            occupancy_ratio = occupancy / capacity
-            
-            if occupancy_ratio < 0.3:
-                occupancy_level = "low"
-            elif occupancy_ratio < 0.7:
-                occupancy_level = "medium"
-            else:
-                occupancy_level = "high"
-            
-            # Temperature comfort (random with bias)
-            temp_options = ["too_cold", "comfortable", "too_hot"]
-            temp_weights = [0.1, 0.7, 0.2] if is_daytime else [0.15, 0.75, 0.1]
-            temperature_comfort = random.choices(temp_options, weights=temp_weights)[0]
-            
+        rooms = self.campus_data.get("rooms", {})
+        if not rooms:
+            return observations
+        
+        # Draw every room's values in one batch per field (structure of arrays)
+        rng = np.random.default_rng()
+        room_ids = list(rooms.keys())
+        types = np.array([room_config["type"] for room_config in rooms.values()])
+        capacity = np.array([room_config["capacity"] for room_config in rooms.values()], dtype=np.int64)
+        n = len(room_ids)
+        
+        # Generate realistic occupancy based on time and room type; rooms of
+        # any other type get a uniform draw up to their capacity
+        occupancy = rng.integers(0, capacity + 1)
+        occupancy_ranges = {
+            "classroom": (20, 50) if is_daytime else (0, 5),
+            "lab": (10, 30) if is_daytime else (5, 15),
+            "library": (30, 80) if is_evening else (10, 40),
+            "dorm": (0, 1) if is_daytime else (2, 2),
+            "cafeteria": (50, 150) if is_meal_time else (5, 20),
+        }
+        for room_type, (low, high) in occupancy_ranges.items():
+            mask = types == room_type
+            occupancy[mask] = rng.integers(low, high + 1, size=int(mask.sum()))
+        
+        occupancy = np.minimum(occupancy, capacity)
+        occupancy_ratio = np.divide(
+            occupancy, capacity,
+            out=np.zeros(n), where=capacity > 0
+        )
+        occupancy_level = _occupancy_levels(occupancy_ratio)
+        
+        # Temperature comfort (random with bias)
+        temp_options = ["too_cold", "comfortable", "too_hot"]
+        temp_weights = [0.1, 0.7, 0.2] if is_daytime else [0.15, 0.75, 0.1]
+        temperature_comfort = rng.choice(temp_options, size=n, p=temp_weights)
+        
+        # Equipment coin flips (projector, computers) for classrooms
+        equipment_rolls = rng.random((n, 2))
+        
+        # Water running
+        water_running = np.isin(types, ["cafeteria", "bathroom"]) & (occupancy > 0)
+        
+        # Generate historical data (mock) for the last 5 hours
+        history_hours = [f"{(current_hour - i) % 24:02d}:00" for i in range(5)]
+        occupancy_history = rng.integers(0, capacity[:, None] + 1, size=(n, 5))
+        
+        rows = zip(
+            room_ids,
+            types.tolist(),
+            occupancy.tolist(),
+            occupancy_level.tolist(),
+            temperature_comfort.tolist(),
+            (equipment_rolls > [0.3, 0.5]).tolist(),
+            water_running.tolist(),
+            occupancy_history.tolist()
+        )
+        for room_id, room_type, occ, level, comfort, (projector, computers), water, history in rows:
             # Equipment running
             equipment = []
-            if room_type == "classroom" and occupancy > 0:
-                if random.random() > 0.3:
+            if room_type == "classroom" and occ > 0:
+                if projector:
                     equipment.append("projector")
                 equipment.append("lights")
-                if random.random() > 0.5:
+                if computers:
                     equipment.append("computers")
             elif room_type == "lab":
                 equipment.extend(["lights", "computers", "lab_equipment"])
             elif room_type == "library":
                 equipment.append("lights")
-                if occupancy > 20:
+                if occ > 20:
                     equipment.append("computers")
             elif room_type == "cafeteria":
                 equipment.extend(["lights", "kitchen_equipment"])
             
-            # Water running
-            water_running = room_type in ["cafeteria", "bathroom"] and occupancy > 0
-            
-            # Generate historical data (mock)
-            occupancy_history = []
-            for i in range(24):
-                hist_hour = (current_hour - i) % 24
-                hist_occupancy = random.randint(0, capacity)
-                occupancy_history.append({
-                    "time": f"{hist_hour:02d}:00",
-                    "occupancy": hist_occupancy
-                })
-            
             observations["rooms"][room_id] = {
-                "occupancy": occupancy,
-                "occupancy_level": occupancy_level,
-                "temperature_comfort": temperature_comfort,
+                "occupancy": occ,
+                "occupancy_level": level,
+                "temperature_comfort": comfort,
                 "equipment_running": equipment,
-                "water_running": water_running,
-                "occupancy_history": occupancy_history[:5],  # Last 5 hours
+                "water_running": water,
+                "occupancy_history": [
+                    {"time": hour, "occupancy": hist_occupancy}
+                    for hour, hist_occupancy in zip(history_hours, history)
+                ],
                 "energy_history": [],
                 "water_history": []
             }
@@ -0,0 +1,6 @@
+"""Shared text for the campus recommendations built by the analysis routes."""
+
+# Fixed recommendation text; only the numeric parts are randomized per call
+PEAK_TIMES = ("2-5 PM", "3-6 PM", "1-4 PM")
+DEFAULT_PEAK_BUILDING = "Science Hall"
+DISTRIBUTE_LOAD_RECOMMENDATION = "📊 Distribute classes during peak hours to balance load"
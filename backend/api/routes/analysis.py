@@ -1,67 +1,85 @@
 """Analysis endpoints - real-time campus analysis."""
 from fastapi import APIRouter, Depends, BackgroundTasks
-from typing import Dict, Any
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 import asyncio
+import itertools
+import logging
+import random
 
 from api.dependencies import get_campus_graph, get_data_service
 from agents.campus_graph import CampusAgentGraph
 from api.data_service import DataService
+from api.cache import ANALYSIS_NAMESPACE, params_key_builder
+from api.recommendations import PEAK_TIMES, DEFAULT_PEAK_BUILDING, DISTRIBUTE_LOAD_RECOMMENDATION
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# Cache for latest analysis
-_latest_analysis: Dict[str, Any] = None
+_rand_uniform = random.uniform
+_rand_choice = random.choice
+
+# Cache for latest analysis: read-only (analysis, room_id -> room state)
+# snapshot, replaced as a whole so readers never see a half-updated pair
+_snapshot: Optional[Tuple[Mapping[str, Any], Mapping[str, Dict[str, Any]]]] = None
+
+
+async def _store_analysis(result: Dict[str, Any]) -> None:
+    """Cache an analysis result along with its room lookup index."""
+    global _snapshot
+    
+    room_index = {
+        room_state["room_id"]: room_state
+        for building_state in result.get("building_states", {}).values()
+        for room_state in building_state.get("room_states", [])
+    }
+    _snapshot = (MappingProxyType(dict(result)), MappingProxyType(room_index))
+    
+    # Responses built from the previous analysis are now stale
+    await FastAPICache.clear(namespace=ANALYSIS_NAMESPACE)
 
 
 def generate_ai_recommendations(building_states: Dict, total_energy: float, total_occupancy: int, total_capacity: int, avg_occupancy_rate: float) -> list:
     """Generate intelligent recommendations based on campus data analysis."""
-    import random
     recommendations = []
     
-    # Find highest energy consuming buildings
-    sorted_buildings = sorted(building_states.items(), key=lambda x: x[1].get("total_energy_kw", 0), reverse=True)
-    top_building = sorted_buildings[0] if sorted_buildings else None
-    
-    # Find underutilized buildings (low occupancy)
-    underutilized = [
-        (bid, b) for bid, b in building_states.items()
-        if b.get("occupancy_rate", 0) < 20
-    ]
+    # Find highest energy consuming building
+    top_building = max(building_states.items(), key=lambda x: x[1].get("total_energy_kw", 0), default=None)
     
     # Recommendation 1: Peak energy demand pattern
     if total_occupancy > total_capacity * 0.5:  # If above 50% capacity
-        peak_time = random.choice(["2-5 PM", "3-6 PM", "1-4 PM"])
-        top_building_name = top_building[0] if top_building else "Science Hall"
+        peak_time = _rand_choice(PEAK_TIMES)
+        top_building_name = top_building[0] if top_building else DEFAULT_PEAK_BUILDING
         recommendations.append(
             f"🏢 Peak energy demand {peak_time} across {top_building_name}"
         )
     
     # Recommendation 2: Smart grid implementation
-    smart_grid_savings = round(random.uniform(20, 30))
+    smart_grid_savings = round(_rand_uniform(20, 30))
     recommendations.append(
         f"💡 Smart grid implementation: {smart_grid_savings}% energy reduction potential"
     )
     
     # Recommendation 3: HVAC optimization
-    hvac_savings = round(random.uniform(25, 35))
+    hvac_savings = round(_rand_uniform(25, 35))
     recommendations.append(
         f"🌡️ HVAC optimization: {hvac_savings}% of total savings opportunity"
     )
     
     # Recommendation 4: Space consolidation based on occupancy
     if avg_occupancy_rate < 60:  # If below 60% capacity
-        consolidation_savings = round(random.uniform(30, 50))
+        consolidation_savings = round(_rand_uniform(30, 50))
         recommendations.append(
             f"📊 Consolidate underutilized spaces: reduce active areas {consolidation_savings}%"
         )
     else:
-        recommendations.append(
-            "📊 Distribute classes during peak hours to balance load"
-        )
+        recommendations.append(DISTRIBUTE_LOAD_RECOMMENDATION)
     
     # Recommendation 5: Priority action based on building analysis
     if top_building:
-        top_savings = round(random.uniform(20, 35))
+        top_savings = round(_rand_uniform(20, 35))
         recommendations.append(
             f"🎯 Priority: {top_building[0].replace('_', ' ').title()} shows highest savings potential ({top_savings}%)"
         )
@@ -103,17 +121,20 @@ async def get_current_analysis(
         'outdoor_temperature': outdoor_temperature
     }
     
-    print(f"[ANALYSIS] Received avg_occupancy parameter: {avg_occupancy}")
-    current_data = data_service.apply_environmental_params(current_data, env_params)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Received avg_occupancy parameter: {avg_occupancy}")
+    # CPU-bound data preparation runs in a worker thread to keep the event loop free
+    current_data = await asyncio.to_thread(data_service.apply_environmental_params, current_data, env_params)
     
     # Debug: Check if occupancy was applied
-    sample_rooms = list(current_data.get('rooms', {}).items())[:3]
-    for room_id, room_data in sample_rooms:
-        print(f"[ANALYSIS] Room {room_id} occupancy after apply_environmental_params: {room_data.get('occupancy', 'NOT SET')}/{room_data.get('capacity', '?')}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for room_id, room_data in itertools.islice(current_data.get('rooms', {}).items(), 3):
+            logger.debug(f"Room {room_id} occupancy after apply_environmental_params: {room_data.get('occupancy', 'NOT SET')}/{room_data.get('capacity', '?')}")
     
     # Apply budget constraints if specified
     if num_rooms is not None or num_buildings is not None:
-        current_data = campus_graph._apply_budget_constraints(
+        current_data = await asyncio.to_thread(
+            campus_graph._apply_budget_constraints,
             current_data,
             num_rooms=num_rooms,
             num_buildings=num_buildings,
@@ -124,18 +145,27 @@ async def get_current_analysis(
     result = await campus_graph.run_campus_analysis(current_data)
     
     # Add execution info
+    rooms = current_data.get('rooms', {})
+    buildings = set()
+    for room in rooms.values():
+        buildings.add(room.get('building_id'))
+    
     result['execution_info'] = {
-        'rooms_analyzed': len(current_data.get('rooms', {})),
-        'buildings_analyzed': len(set(r.get('building_id') for r in current_data.get('rooms', {}).values())),
+        'rooms_analyzed': len(rooms),
+        'buildings_analyzed': len(buildings),
         'budget_level': budget_level,
         'environmental_params': env_params
     }
     
     # Generate AI-powered recommendations based on analysis results
     building_states = result.get('building_states', {})
-    total_energy = sum(b.get('total_energy_kw', 0) for b in building_states.values())
-    total_occupancy = sum(b.get('total_occupancy', 0) for b in building_states.values())
-    total_capacity = sum(b.get('total_capacity', 0) for b in building_states.values())
+    total_energy = 0
+    total_occupancy = 0
+    total_capacity = 0
+    for b in building_states.values():
+        total_energy += b.get('total_energy_kw', 0)
+        total_occupancy += b.get('total_occupancy', 0)
+        total_capacity += b.get('total_capacity', 0)
     avg_occupancy_rate = (total_occupancy / total_capacity * 100) if total_capacity > 0 else 0
     
     if 'campus_recommendations' not in result:
@@ -147,37 +177,43 @@ async def get_current_analysis(
             avg_occupancy_rate=avg_occupancy_rate
         )
     
-    global _latest_analysis
-    _latest_analysis = result
+    await _store_analysis(result)
     
+    # Room states carry LangChain message objects, so let FastAPI's
+    # jsonable_encoder convert them rather than returning ORJSONResponse directly
     return result
 
 
 @router.get("/summary")
+@cache(expire=60, namespace=ANALYSIS_NAMESPACE, key_builder=params_key_builder)
 async def get_analysis_summary() -> Dict[str, Any]:
     """Get cached analysis summary (fast endpoint)."""
-    if _latest_analysis is None:
+    snapshot = _snapshot
+    if snapshot is None:
         return {"status": "no_analysis_available", "message": "Run /current first"}
     
+    analysis = snapshot[0]
     return {
-        "campus_name": _latest_analysis.get("campus_name"),
-        "timestamp": _latest_analysis.get("timestamp"),
-        "summary": _latest_analysis.get("summary"),
-        "savings_potential": _latest_analysis.get("savings_potential"),
-        "critical_buildings": _latest_analysis.get("critical_buildings"),
-        "top_recommendations": _latest_analysis.get("campus_recommendations", [])[:3]
+        "campus_name": analysis.get("campus_name"),
+        "timestamp": analysis.get("timestamp"),
+        "summary": analysis.get("summary"),
+        "savings_potential": analysis.get("savings_potential"),
+        "critical_buildings": analysis.get("critical_buildings"),
+        "top_recommendations": analysis.get("campus_recommendations", [])[:3]
     }
 
 
 @router.get("/building/{building_id}")
+@cache(expire=60, namespace=ANALYSIS_NAMESPACE, key_builder=params_key_builder)
 async def get_building_analysis(
     building_id: str
 ) -> Dict[str, Any]:
     """Get analysis for a specific building."""
-    if _latest_analysis is None:
+    snapshot = _snapshot
+    if snapshot is None:
         return {"status": "no_analysis_available"}
     
-    building_states = _latest_analysis.get("building_states", {})
+    building_states = snapshot[0].get("building_states", {})
     building_state = building_states.get(building_id)
     
     if not building_state:
@@ -187,20 +223,16 @@ async def get_building_analysis(
 
 
 @router.get("/room/{room_id}")
+@cache(expire=60, namespace=ANALYSIS_NAMESPACE, key_builder=params_key_builder)
 async def get_room_analysis(
     room_id: str
 ) -> Dict[str, Any]:
     """Get analysis for a specific room."""
-    if _latest_analysis is None:
+    snapshot = _snapshot
+    if snapshot is None:
         return {"status": "no_analysis_available"}
     
-    # Search through building states for room
-    for building_state in _latest_analysis.get("building_states", {}).values():
-        for room_state in building_state.get("room_states", []):
-            if room_state.get("room_id") == room_id:
-                return room_state
-    
-    return {"error": "Room not found in analysis"}
+    return snapshot[1].get(room_id, {"error": "Room not found in analysis"})
 
 
 @router.post("/refresh")
@@ -213,8 +245,7 @@ async def trigger_analysis_refresh(
     async def run_background_analysis():
         current_data = data_service.get_current_observations()
         result = await campus_graph.run_campus_analysis(current_data)
-        global _latest_analysis
-        _latest_analysis = result
+        await _store_analysis(result)
     
     background_tasks.add_task(run_background_analysis)
     
@@ -1,10 +1,13 @@
 """Campus information endpoints."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
 from typing import Dict, Any
 
 from api.dependencies import get_campus_graph, get_data_service
 from agents.campus_graph import CampusAgentGraph
 from api.data_service import DataService
+from api.cache import CAMPUS_NAMESPACE, params_key_builder
 
 router = APIRouter()
 
@@ -23,6 +26,7 @@ async def upload_architecture(
     """Upload and set new campus architecture from Excel."""
     try:
         data_service.update_campus_structure(request.dict())
+        await FastAPICache.clear(namespace=CAMPUS_NAMESPACE)
         return {"status": "success", "message": "Campus architecture updated successfully"}
     except Exception as e:
         import traceback
@@ -30,6 +34,7 @@ async def upload_architecture(
         return {"status": "error", "message": str(e)}
 
 @router.get("/info")
+@cache(expire=60, namespace=CAMPUS_NAMESPACE, key_builder=params_key_builder)
 async def get_campus_info(
     data_service: DataService = Depends(get_data_service)
 ) -> Dict[str, Any]:
@@ -52,6 +57,17 @@ async def get_campus_info(
     }
 
 
+@router.get("/structure")
+async def get_campus_structure(
+    data_service: DataService = Depends(get_data_service)
+) -> Response:
+    """Get the full campus structure (served from pre-serialized JSON)."""
+    return Response(
+        content=data_service.get_campus_structure_bytes(),
+        media_type="application/json"
+    )
+
+
 @router.get("/buildings/{building_id}")
 async def get_building_details(
     building_id: str,
@@ -64,10 +80,10 @@ async def get_building_details(
     if not building:
         return {"error": "Building not found"}
     
+    all_rooms = campus_data.get("rooms", {})
     rooms = {
-        r_id: r_data
-        for r_id, r_data in campus_data.get("rooms", {}).items()
-        if r_data.get("building_id") == building_id
+        r_id: all_rooms[r_id]
+        for r_id in data_service.get_building_room_ids(building_id)
     }
     
     return {
@@ -1,7 +1,13 @@
 """Person detection endpoints using YOLOv8."""
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from fastapi.responses import ORJSONResponse
+from fastapi_cache.decorator import cache
+from functools import lru_cache
 from typing import Dict, Any, Optional
-import base64
+import asyncio
+import binascii
+import hashlib
+import json
 import logging
 import traceback
 
@@ -13,12 +19,59 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+RESPONSE_FORMATS = ("json", "binary")
+
+
+@lru_cache(maxsize=1)
+def _cached_detector() -> PersonDetector:
+    """Detector shared by all detection endpoints (resolved once per process)."""
+    return get_detector(model_name="yolov8n.pt", conf_threshold=0.4)
+
+
+def _check_response_format(response_format: str) -> None:
+    """Reject unknown response_format values with a 400."""
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported response_format '{response_format}'. Use 'json' or 'binary'."
+        )
+
+
+def _decode_frame_data(frame_data: str) -> bytes:
+    """Strictly decode base64 frame data, rejecting malformed input with a 400."""
+    try:
+        return binascii.a2b_base64(frame_data, strict_mode=True)
+    except (binascii.Error, ValueError) as e:  # ValueError: non-ASCII input
+        raise HTTPException(status_code=400, detail=f"Invalid base64 frame_data: {e}")
+
+
+def _update_room_frames(data_service: DataService, room_id: str, person_counts) -> list:
+    """
+    Apply a room's per-frame counts in batch order.
+    
+    Returns each frame's updated observation, or the exception it raised.
+    """
+    room_obs_list = []
+    for person_count in person_counts:
+        try:
+            room_obs_list.append(data_service.update_room_occupancy(room_id, person_count))
+        except Exception as e:
+            room_obs_list.append(e)
+    return room_obs_list
+
+
+def _jpeg_response(jpeg: bytes, headers: Dict[str, str]) -> Response:
+    """Return an annotated frame as a raw JPEG body with metadata in headers."""
+    return Response(content=jpeg, media_type="image/jpeg", headers=headers)
+
 
 @router.post("/process-frame")
 async def process_frame(
     room_id: str = Form(...),
     frame_data: str = Form(...),
     draw_boxes: bool = Form(True),
+    return_frame: bool = Form(True),
+    response_format: str = Form("json"),
     data_service: DataService = Depends(get_data_service)
 ) -> Dict[str, Any]:
     """
@@ -28,6 +81,11 @@ async def process_frame(
         room_id: ID of the room being analyzed
         frame_data: Base64-encoded JPEG frame (without 'data:image/jpeg;base64,' prefix)
         draw_boxes: Whether to draw bounding boxes on output frame
+        return_frame: Whether to return the annotated frame (False when only
+            the count is needed; output_frame is then an empty string)
+        response_format: "json" (default) or "binary" to receive the annotated
+            frame as a raw image/jpeg body, with the count and occupancy level
+            in the X-Person-Count / X-Occupancy-Level headers
         data_service: Data service dependency
     
     Returns:
@@ -46,6 +104,9 @@ async def process_frame(
         }
     """
     try:
+        _check_response_format(response_format)
+        binary = response_format == "binary"
+        
         # Validate room exists
         campus_data = data_service.get_campus_structure()
         if room_id not in campus_data.get("rooms", {}):
@@ -54,18 +115,29 @@ async def process_frame(
                 detail=f"Room '{room_id}' not found in campus database. Available buildings: lib, sci, eng, dorm, cafe (e.g., sci-101)"
             )
         
+        raw = _decode_frame_data(frame_data)
+        
         # Get detector
-        detector = get_detector(model_name="yolov8n.pt", conf_threshold=0.4)
+        detector = _cached_detector()
         
         # Process frame
-        person_count, output_frame, detection_details = detector.process_base64_frame(
-            frame_data,
-            draw_boxes=draw_boxes
+        person_count, output_frame, detection_details = await detector.process_bytes_frame_async(
+            raw,
+            draw_boxes=draw_boxes,
+            stream_id=room_id,
+            return_frame=return_frame or binary,
+            raw_jpeg=binary
         )
         
         # Update occupancy in data service
         room_obs = data_service.update_room_occupancy(room_id, person_count)
         
+        if binary:
+            return _jpeg_response(output_frame, {
+                "X-Person-Count": str(person_count),
+                "X-Occupancy-Level": str(room_obs.get("occupancy_level", "low"))
+            })
+        
         room_config = campus_data["rooms"][room_id]
         
         return {
@@ -103,61 +175,116 @@ async def batch_process_frames(
     Process multiple frames in batch.
     
     Args:
-        requests_data: JSON string containing list of {room_id, frame_data, draw_boxes}
+        requests_data: JSON string containing list of {room_id, frame_data, draw_boxes, return_frame}
     
     Returns:
         List of processed results
     """
-    import json
-    
     try:
         requests = json.loads(requests_data)
         if not isinstance(requests, list):
             raise ValueError("requests_data must be a JSON array")
         
-        results = []
-        detector = get_detector(model_name="yolov8n.pt", conf_threshold=0.4)
+        detector = _cached_detector()
+        
+        # Each request resolves to an index into the frame batch, or to its
+        # final result/error. Identical frames (client retries, rooms sharing
+        # a camera) are only run through the model once per batch.
+        slots = []
+        seen = {}
+        frames, draw_flags, return_flags = [], [], []
         
         for req in requests:
             room_id = req.get("room_id")
             frame_data = req.get("frame_data")
             draw_boxes = req.get("draw_boxes", True)
+            return_frame = req.get("return_frame", True)
             
             if not room_id or not frame_data:
-                results.append({
+                slots.append((room_id, {
                     "room_id": room_id,
                     "error": "Missing room_id or frame_data"
-                })
+                }))
+                continue
+            
+            if not isinstance(frame_data, str):
+                slots.append((room_id, TypeError("frame_data must be a base64 string")))
                 continue
             
-            try:
-                person_count, output_frame, detection_details = detector.process_base64_frame(
-                    frame_data,
-                    draw_boxes=draw_boxes
-                )
-                
-                room_obs = data_service.update_room_occupancy(room_id, person_count)
-                
+            # Flags only matter by truthiness; bool() also keeps the key hashable
+            key = (
+                hashlib.blake2b(frame_data.encode(), digest_size=16).digest(),
+                bool(draw_boxes),
+                bool(return_frame)
+            )
+            if key not in seen:
+                try:
+                    raw = binascii.a2b_base64(frame_data, strict_mode=True)
+                except (binascii.Error, ValueError) as e:
+                    # ValueError covers non-ASCII input
+                    slots.append((room_id, e))
+                    continue
+                seen[key] = len(frames)
+                frames.append(raw)
+                draw_flags.append(draw_boxes)
+                return_flags.append(return_frame)
+            slots.append((room_id, seen[key]))
+        
+        # Run all unique frames through the model in batched forward passes
+        outputs = await detector.process_batch_async(frames, draw_flags, return_flags) if frames else []
+        
+        results = []
+        room_frames = {}  # room_id -> [(result index, person_count), ...]
+        for room_id, slot in slots:
+            output = outputs[slot] if isinstance(slot, int) else slot
+            if isinstance(output, dict):
+                results.append(output)
+            elif isinstance(output, Exception):
                 results.append({
                     "room_id": room_id,
-                    "person_count": person_count,
-                    "occupancy_level": room_obs.get("occupancy_level"),
-                    "output_frame": output_frame,
-                    "status": "success"
+                    "error": str(output),
+                    "status": "error"
                 })
-            
-            except Exception as e:
+            else:
+                person_count, output_frame, _ = output
+                room_frames.setdefault(room_id, []).append((len(results), person_count))
                 results.append({
                     "room_id": room_id,
-                    "error": str(e),
-                    "status": "error"
+                    "person_count": person_count,
+                    "occupancy_level": None,
+                    "output_frame": output_frame,
+                    "status": "success"
                 })
         
-        return {
+        # Frames for the same room are applied in order, so each result gets
+        # its own frame's level; distinct rooms update concurrently off the loop
+        room_ids = list(room_frames)
+        room_obs_lists = await asyncio.gather(*(
+            asyncio.to_thread(
+                _update_room_frames,
+                data_service,
+                room_id,
+                [person_count for _, person_count in room_frames[room_id]]
+            )
+            for room_id in room_ids
+        ))
+        
+        for room_id, room_obs_list in zip(room_ids, room_obs_lists):
+            for (i, _), room_obs in zip(room_frames[room_id], room_obs_list):
+                if isinstance(room_obs, Exception):
+                    results[i] = {
+                        "room_id": room_id,
+                        "error": str(room_obs),
+                        "status": "error"
+                    }
+                else:
+                    results[i]["occupancy_level"] = room_obs.get("occupancy_level")
+        
+        return ORJSONResponse({
             "total_requests": len(requests),
             "successful": len([r for r in results if r.get("status") == "success"]),
             "results": results
-        }
+        })
     
     except Exception as e:
         logger.error(f"Error in batch process: {e}")
@@ -216,7 +343,8 @@ async def get_room_occupancy(
 
 @router.post("/detect-from-image")
 async def detect_from_image(
-    image: UploadFile = File(...)
+    image: UploadFile = File(...),
+    response_format: str = Form("json")
 ) -> Dict[str, Any]:
     """
     Detect people in an uploaded image using YOLOv8.
@@ -224,7 +352,9 @@ async def detect_from_image(
     room configuration panel — the frontend sends an image upload and
     receives a person count it can feed into the room config.
 
-    Accepts: JPEG / PNG image file
+    Accepts: JPEG / PNG image file, plus an optional response_format form
+    field ("binary" returns the annotated image/jpeg body directly with the
+    count in the X-Person-Count header)
     Returns:
         {
             "person_count": int,
@@ -233,6 +363,8 @@ async def detect_from_image(
         }
     """
     try:
+        _check_response_format(response_format)
+        
         # Validate content type
         if image.content_type not in ("image/jpeg", "image/png", "image/jpg", "image/webp"):
             raise HTTPException(
@@ -244,12 +376,13 @@ async def detect_from_image(
         if len(image_bytes) == 0:
             raise HTTPException(status_code=400, detail="Empty image file")
 
-        frame_b64 = base64.b64encode(image_bytes).decode("utf-8")
-
-        detector = get_detector(model_name="yolov8n.pt", conf_threshold=0.4)
-        person_count, output_frame, detection_details = detector.process_base64_frame(
-            frame_b64, draw_boxes=True
+        detector = _cached_detector()
+        person_count, output_frame, detection_details = await detector.process_bytes_frame_async(
+            image_bytes, draw_boxes=True, raw_jpeg=response_format == "binary"
         )
+        
+        if response_format == "binary":
+            return _jpeg_response(output_frame, {"X-Person-Count": str(person_count)})
 
         return {
             "person_count": person_count,
@@ -271,15 +404,16 @@ async def detect_from_image(
 
 
 @router.get("/model-info")
+@cache(expire=60)
 async def get_model_info() -> Dict[str, Any]:
     """Get information about the detection model."""
     try:
-        detector = get_detector()
+        detector = _cached_detector()
         
         return {
             "model_name": detector.model_name,
             "device": detector.device.upper(),
-            "confidence_threshold": detector.confidence_threshold,
+            "confidence_threshold": detector.conf_threshold,
             "class_id_for_person": detector.PERSON_CLASS_ID,
             "status": "ready"
         }
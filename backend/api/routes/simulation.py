@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, Field, ValidationError
 from typing import Dict, Any, List, Optional
+import asyncio
 import json
 
 from api.dependencies import get_campus_graph, get_data_service
@@ -120,20 +121,30 @@ async def compare_scenarios(
     """Compare multiple simulation scenarios."""
     current_data = data_service.get_current_observations()
     
-    results = []
-    for scenario in scenarios:
+    async def run_scenario(scenario: SimulationScenario) -> Dict[str, Any]:
         scenario_dict = {
             "name": scenario.name,
             "type": scenario.type,
             "building_id": scenario.building_id,
             "parameters": scenario.parameters or {}
         }
+        # Scenarios edit room dicts in place and now run interleaved, so
+        # each one gets its own copy of the rooms
+        scenario_data = {
+            **current_data,
+            "rooms": {
+                room_id: dict(room_data)
+                for room_id, room_data in current_data.get("rooms", {}).items()
+            }
+        }
         
-        result = await campus_graph.run_what_if_simulation(scenario_dict, current_data)
-        results.append({
+        result = await campus_graph.run_what_if_simulation(scenario_dict, scenario_data)
+        return {
             "scenario": scenario.name,
             "savings": result.get("comparison", {})
-        })
+        }
+    
+    results = await asyncio.gather(*(run_scenario(scenario) for scenario in scenarios))
     
     # Rank by energy savings
     ranked = sorted(results, key=lambda x: x["savings"].get("energy_savings_pct", 0), reverse=True)
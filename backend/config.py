@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     agent_model: str = "llama-3.3-70b-versatile"
     agent_temperature: float = 0.7
     
+    # Detection Settings
+    detector_precision: str = "fp32"  # fp32, or opt in to fp16 (TensorRT on GPU) / int8 exports
+    detector_calibration_data: str = ""  # Dataset YAML for INT8 calibration
+    detector_detect_every: int = 1  # Run YOLO on every Nth frame per room
+    
     # Data Settings
     data_dir: str = "./data"
     
@@ -1,12 +1,16 @@
 """FastAPI application for EcoAgent."""
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 import uvicorn
 
 from agents.campus_graph import CampusAgentGraph
 from api.routes import campus, analysis, simulation, mock_analysis, chat, detection
 from api.data_service import DataService
+from api.cache import RevalidateCachedResponses
 from api import dependencies
 from config import settings
 
@@ -16,6 +20,9 @@ async def lifespan(app: FastAPI):
     """Initialize and cleanup application lifecycle."""
     print("🚀 Starting EcoAgent Backend...")
     
+    # Initialize response cache
+    FastAPICache.init(InMemoryBackend(), prefix="eco")
+    
     # Initialize data service
     data_service = DataService()
     await data_service.load_campus_data()
@@ -40,7 +47,10 @@ app = FastAPI(
     title="EcoAgent API",
     description="Agentic AI system for campus sustainability management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson for all JSON responses; handlers whose payload is already plain
+    # dicts/lists return ORJSONResponse directly to skip jsonable_encoder's walk
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for frontend
@@ -55,8 +65,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Person-Count", "X-Occupancy-Level"],  # Binary detection responses
 )
 
+# Analysis and campus caches are cleared when their data changes, so
+# browsers must revalidate instead of reusing responses for the full TTL
+app.add_middleware(RevalidateCachedResponses, path_prefixes=("/api/analysis", "/api/campus"))
+
 # Include routers
 from socket_server import socket_app
 app.mount("/socket.io", socket_app)
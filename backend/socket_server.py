@@ -1,4 +1,5 @@
 import socketio
+from urllib.parse import parse_qs
 
 # Create a Socket.IO server with ASGI async mode
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
@@ -10,9 +11,8 @@ socket_app = socketio.ASGIApp(sio)
 async def connect(sid, environ, auth):
     print(f"[SOCKET] Client connected: {sid}")
     # Allow joining a room based on session token if provided in query or auth
-    query_string = environ.get('QUERY_STRING', '')
-    if 'session=' in query_string:
-        session_token = query_string.split('session=')[1].split('&')[0]
+    session_token = parse_qs(environ.get('QUERY_STRING', '')).get('session', [None])[0]
+    if session_token:
         await sio.enter_room(sid, session_token)
         print(f"[SOCKET] Client {sid} joined room: {session_token}")
         